@@ -8,16 +8,42 @@ Suporta: UNIANDRADE, UNIB, UNISMG
 
 import streamlit as st
 import pandas as pd
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER
 from datetime import datetime
+from xml.sax.saxutils import escape
 import os
 import io
+import hashlib
 import zipfile
+import zlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
 from pathlib import Path
+from types import ModuleType
+
+
+# Desativar validação de atributos do ReportLab (ganho de desempenho)
+rl_config.shapeChecking = 0
+
+# Gravar streams binários, sem a codificação ASCII85 (feita em Python puro)
+rl_config.useA85 = 0
+
+# Comprimir os streams do PDF (conteúdo das páginas e logos) com zlib nível 1
+# (cópia do módulo zlib: os demais atributos usados pelo ReportLab continuam disponíveis)
+_zlib_nivel1 = ModuleType('zlib')
+_zlib_nivel1.__dict__.update(vars(zlib))
+_zlib_nivel1.compress = lambda data, level=1: zlib.compress(data, level)
+pdfdoc.zlib = _zlib_nivel1
 
 
 # Configurações das IES
@@ -40,194 +66,189 @@ IES_CONFIG = {
 }
 
 
-def formatar_cpf(cpf):
-    """Formata CPF para o padrão XXX.XXX.XXX-XX"""
-    cpf = str(cpf).replace('.', '').replace('-', '').replace(' ', '')
-    if len(cpf) == 11:
-        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
-    return cpf
+# Códigos numéricos aceitos na coluna IES da planilha
+_CODIGOS_IES = {
+    '1': 'UNIANDRADE',
+    '201': 'UNISMG',
+    '301': 'UNIB'
+}
 
 
-def formatar_data_extenso():
-    """Retorna a data atual por extenso em português"""
-    data_atual = datetime.now()
-    meses = {
-        1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
-        5: 'maio', 6: 'junho', 7: 'julho', 8: 'agosto',
-        9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
-    }
-    return f"{data_atual.day} de {meses[data_atual.month]} de {data_atual.year}"
+# Processos do pool iniciados por spawn: fork a partir do servidor multithread do
+# Streamlit pode travar (cada processo importa o app e carrega seus próprios logos)
+_MP_CONTEXT = multiprocessing.get_context('spawn')
+
+
+# Colunas obrigatórias da planilha
+_COLUNAS_NECESSARIAS = ['NOME', 'CPF', 'RUA', 'BAIRRO', 'CIDADE', 'UF', 'CURSO']
+
+
+# Estilos (criados uma única vez e reutilizados em todos os termos)
+_styles = getSampleStyleSheet()
+
+# Estilo para título
+_STYLE_TITULO = ParagraphStyle(
+    'CustomTitle',
+    parent=_styles['Heading1'],
+    fontSize=14,
+    textColor='black',
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+# Estilo para texto justificado
+_STYLE_TEXTO = ParagraphStyle(
+    'Justify',
+    parent=_styles['BodyText'],
+    fontSize=11,
+    alignment=TA_JUSTIFY,
+    spaceAfter=12,
+    leading=16,
+    fontName='Helvetica'
+)
+
+# Estilo para assinatura (centralizado)
+_STYLE_ASSINATURA = ParagraphStyle(
+    'Assinatura',
+    parent=_styles['BodyText'],
+    fontSize=11,
+    alignment=TA_CENTER,
+    spaceAfter=6,
+    leading=14,
+    fontName='Helvetica'
+)
+
+# Estilo para data (alinhado à direita)
+_STYLE_DATA = ParagraphStyle(
+    'Data',
+    parent=_styles['BodyText'],
+    fontSize=11,
+    alignment=2,  # RIGHT alignment
+    spaceAfter=6,
+    leading=14,
+    fontName='Helvetica'
+)
+
+# Margens do documento
+_MARGIN = 2*cm
+
+# Área útil da página (margens + recuo interno de 6pt)
+_PAGE_WIDTH, _PAGE_HEIGHT = A4
+_X_CONTEUDO = _MARGIN + 6
+_LARGURA_UTIL = _PAGE_WIDTH - 2*_X_CONTEUDO
+_Y_TOPO = _PAGE_HEIGHT - _MARGIN - 6
+_Y_BASE = _MARGIN + 6
 
 
-def gerar_termo_pdf_bytes(aluno_data, ies):
+def _carregar_logo(logo_path):
     """
-    Gera um termo em PDF e retorna os bytes do arquivo
+    Lê o logo do disco e calcula suas dimensões de desenho
     
     Args:
-        aluno_data: Dicionário com os dados do aluno
-        ies: Código da IES (UNIANDRADE, UNIB ou UNISMG)
+        logo_path: Caminho do arquivo de logo
     
     Returns:
-        tuple: (bytes do PDF, nome do arquivo)
+        tuple: (ImageReader do logo, largura, altura) ou None se o logo não puder ser carregado
     """
-    # Validar IES
-    if ies not in IES_CONFIG:
-        raise ValueError(f"IES '{ies}' não é válida. Use: UNIANDRADE, UNIB ou UNISMG")
-    
-    ies_info = IES_CONFIG[ies]
-    
-    # Nome do arquivo PDF
-    nome_arquivo = f"{aluno_data['NOME'].replace(' ', '_')}_{ies}_termo.pdf"
-    
-    # Criar buffer de memória para o PDF
-    buffer = io.BytesIO()
-    
-    # Criar documento PDF
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm
-    )
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    
-    # Estilo para título
-    style_titulo = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=14,
-        textColor='black',
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Estilo para texto justificado
-    style_texto = ParagraphStyle(
-        'Justify',
-        parent=styles['BodyText'],
-        fontSize=11,
-        alignment=TA_JUSTIFY,
-        spaceAfter=12,
-        leading=16,
-        fontName='Helvetica'
-    )
-    
-    # Estilo para assinatura (centralizado)
-    style_assinatura = ParagraphStyle(
-        'Assinatura',
-        parent=styles['BodyText'],
-        fontSize=11,
-        alignment=TA_CENTER,
-        spaceAfter=6,
-        leading=14,
-        fontName='Helvetica'
-    )
-    
-    # Estilo para data (alinhado à direita)
-    style_data = ParagraphStyle(
-        'Data',
-        parent=styles['BodyText'],
-        fontSize=11,
-        alignment=2,  # RIGHT alignment
-        spaceAfter=6,
-        leading=14,
-        fontName='Helvetica'
-    )
-    
-    # Conteúdo do documento
-    story = []
-    
-    # Adicionar logo se existir
-    logo_path = ies_info.get('logo')
-    if logo_path and os.path.exists(logo_path):
-        try:
-            # Carregar logo e ajustar tamanho mantendo proporção
-            logo = Image(logo_path)
-            
-            # Obter proporção original da imagem
-            aspect_ratio = logo.imageWidth / logo.imageHeight
-            
-            # Definir tamanho máximo (aumentado)
-            max_width = 12*cm
-            max_height = 5*cm
-            
-            # Calcular dimensões mantendo proporção
-            if aspect_ratio > (max_width / max_height):
-                # Imagem mais larga - limitar pela largura
-                logo.drawWidth = max_width
-                logo.drawHeight = max_width / aspect_ratio
-            else:
-                # Imagem mais alta - limitar pela altura
-                logo.drawHeight = max_height
-                logo.drawWidth = max_height * aspect_ratio
-            
-            # Adicionar logo centralizado
-            logo.hAlign = 'CENTER'
-            story.append(logo)
-            story.append(Spacer(1, 0.5*cm))
-        except Exception as e:
-            # Se houver erro ao carregar logo, adiciona nome da IES
-            nome_ies = Paragraph(f"<b>{ies_info['nome_completo']}</b>", style_titulo)
-            story.append(nome_ies)
-            story.append(Spacer(1, 0.5*cm))
-    else:
-        # Se logo não existe, adiciona nome da IES
-        nome_ies = Paragraph(f"<b>{ies_info['nome_completo']}</b>", style_titulo)
-        story.append(nome_ies)
-        story.append(Spacer(1, 0.5*cm))
+    if not logo_path:
+        return None
     
-    # Título
-    titulo = Paragraph("TERMO DE RESPONSABILIDADE DE ENTREGA DE DOCUMENTOS", style_titulo)
-    story.append(titulo)
-    story.append(Spacer(1, 1*cm))
-    
-    # Formatar CPF e data
-    cpf_formatado = formatar_cpf(aluno_data['CPF'])
-    data_extenso = formatar_data_extenso()
-    
-    # Primeiro parágrafo
-    texto1 = f"""
-    Eu, <b>{aluno_data['NOME']}</b>, brasileiro(a), inscrito(a) no Cadastro de Pessoas 
-    Físicas CPF/MF sob n. <b>{cpf_formatado}</b>, residente e domiciliado(a) na rua 
-    <b>{aluno_data['RUA']}</b>, <b>{aluno_data['BAIRRO']}</b>, <b>{aluno_data['CIDADE']}</b>, 
-    <b>{aluno_data['UF']}</b>, declaro que entreguei total ou parcialmente todos os documentos 
+    try:
+        with open(logo_path, 'rb') as f:
+            logo_bytes = f.read()
+        
+        # Obter proporção original da imagem
+        logo = ImageReader(io.BytesIO(logo_bytes))
+        image_width, image_height = logo.getSize()
+        aspect_ratio = image_width / image_height
+    except Exception:
+        # Se houver erro ao carregar logo, o termo usa o nome da IES
+        return None
+    
+    # Definir tamanho máximo (aumentado)
+    max_width = 12*cm
+    max_height = 5*cm
+    
+    # Calcular dimensões mantendo proporção
+    if aspect_ratio > (max_width / max_height):
+        # Imagem mais larga - limitar pela largura
+        return logo, max_width, max_width / aspect_ratio
+    
+    # Imagem mais alta - limitar pela altura
+    return logo, max_height * aspect_ratio, max_height
+
+
+@st.cache_resource
+def _verificar_logos():
+    """Verifica uma única vez quais logos existem em disco (mantido entre as reexecuções)"""
+    return {ies: os.path.exists(ies_info['logo']) for ies, ies_info in IES_CONFIG.items()}
+
+
+@st.cache_resource
+def _carregar_logos():
+    """Carrega os logos disponíveis de cada IES (mantido entre as reexecuções)"""
+    logos = {}
+    for ies, ies_info in IES_CONFIG.items():
+        if not _LOGO_PATHS_OK[ies]:
+            continue
+        
+        logo = _carregar_logo(ies_info['logo'])
+        if logo:
+            logos[ies] = logo
+    return logos
+
+
+# Presença do logo de cada IES em disco
+_LOGO_PATHS_OK = _verificar_logos()
+
+# Logos de cada IES: (ImageReader reutilizável, largura, altura)
+_LOGO_CACHE = _carregar_logos()
+
+
+# Primeiro parágrafo (preenchido com os dados de cada aluno)
+_TEXTO1_TEMPLATE = """
+    Eu, <b>{nome}</b>, brasileiro(a), inscrito(a) no Cadastro de Pessoas 
+    Físicas CPF/MF sob n. <b>{cpf}</b>, residente e domiciliado(a) na rua 
+    <b>{rua}</b>, <b>{bairro}</b>, <b>{cidade}</b>, 
+    <b>{uf}</b>, declaro que entreguei total ou parcialmente todos os documentos 
     necessários para conclusão da minha matrícula.
     """
-    paragrafo1 = Paragraph(texto1, style_texto)
-    story.append(paragrafo1)
+
+
+def _montar_paragrafos_fixos(ies, ies_info):
+    """
+    Monta os parágrafos do termo que não dependem dos dados do aluno
     
+    Args:
+        ies: Código da IES (UNIANDRADE, UNIB ou UNISMG)
+        ies_info: Configuração da IES em IES_CONFIG
+    
+    Returns:
+        tuple: (segundo parágrafo, template do terceiro parágrafo, quarto parágrafo)
+    """
     # Segundo parágrafo
     texto2 = """
     Os documentos entregues serão validados pela secretaria, que poderá solicitar a 
     complementação ou nova entrega dos mesmos.
     """
-    paragrafo2 = Paragraph(texto2, style_texto)
-    story.append(paragrafo2)
     
-    # Terceiro parágrafo (varia conforme IES)
+    # Terceiro parágrafo (varia conforme IES; o curso é preenchido por aluno)
     if ies == 'UNIANDRADE':
-        texto3 = f"""
+        texto3_template = f"""
         Declaro ainda sob as penas da lei e para os devidos fins de direito, que assumo 
         integral responsabilidade pela apresentação dos comprovantes de conclusão do ensino 
-        médio até 01(um) dia útil antes do início das aulas do curso de <b>{aluno_data['CURSO']}</b>, 
+        médio até 01(um) dia útil antes do início das aulas do curso de <b>{{curso}}</b>, 
         a ser ministrado pelo {ies_info['nome_completo']}.
         """
     else:
-        texto3 = f"""
+        texto3_template = f"""
         Declaro sob as penas da lei e para os devidos fins de direito, que assumo 
         integral responsabilidade pela apresentação dos comprovantes de conclusão do ensino 
-        médio até 01(um) dia útil antes do início das aulas do curso de <b>{aluno_data['CURSO']}</b>, 
+        médio até 01(um) dia útil antes do início das aulas do curso de <b>{{curso}}</b>, 
         a ser ministrado pela {ies_info['nome_completo']}.
         """
     
-    paragrafo3 = Paragraph(texto3, style_texto)
-    story.append(paragrafo3)
-    
     # Quarto parágrafo
     texto4 = f"""
     Declaro ainda, que tenho pleno conhecimento que a ausência de apresentação do comprovante 
@@ -237,48 +258,246 @@ def gerar_termo_pdf_bytes(aluno_data, ies):
     obrigação relativa ao descumprimento por mim ocasionado. E, por ser a expressão da verdade, 
     firmo o presente.
     """
-    paragrafo4 = Paragraph(texto4, style_texto)
-    story.append(paragrafo4)
-    story.append(Spacer(1, 2*cm))
     
-    # Data e local (alinhado à direita)
-    local_data = Paragraph(f"{aluno_data['CIDADE']}, {data_extenso}.", style_data)
-    story.append(local_data)
-    story.append(Spacer(1, 1.5*cm))
+    return Paragraph(texto2, _STYLE_TEXTO), texto3_template, Paragraph(texto4, _STYLE_TEXTO)
+
+
+# Parágrafos fixos de cada IES: (segundo parágrafo, template do terceiro, quarto parágrafo)
+_STATIC_PARAGRAPHS = {
+    ies: _montar_paragrafos_fixos(ies, ies_info)
+    for ies, ies_info in IES_CONFIG.items()
+}
+
+
+# Nomes dos meses (índice = número do mês)
+_MESES = (
+    '', 'janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+    'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro'
+)
+
+
+# Tabela para remover a pontuação do CPF em uma única passada
+_CPF_PONTUACAO = str.maketrans('', '', '.- ')
+
+
+def formatar_cpf(cpf):
+    """Formata CPF para o padrão XXX.XXX.XXX-XX"""
+    cpf = str(cpf).translate(_CPF_PONTUACAO)
+    if len(cpf) == 11:
+        return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+    return cpf
+
+
+def formatar_data_extenso():
+    """Retorna a data atual por extenso em português"""
+    data_atual = datetime.now()
+    return f"{data_atual.day} de {_MESES[data_atual.month]} de {data_atual.year}"
+
+
+def _nova_pagina_se_necessario(c, y, altura):
+    """
+    Inicia uma nova página se o bloco não couber acima da margem inferior
+    
+    Args:
+        c: Canvas em que o bloco será desenhado
+        y: Posição vertical do topo do bloco
+        altura: Altura do bloco
+    
+    Returns:
+        float: Posição vertical do topo do bloco (topo da nova página, se houve quebra)
+    """
+    if y - altura < _Y_BASE and y < _Y_TOPO:
+        c.showPage()
+        return _Y_TOPO
+    return y
+
+
+def _desenhar_paragrafo(c, paragrafo, y):
+    """
+    Desenha um parágrafo na área útil da página, continuando na página seguinte
+    quando ele não couber na atual
+    
+    Args:
+        c: Canvas em que o parágrafo será desenhado
+        paragrafo: Paragraph já montado
+        y: Posição vertical do topo do parágrafo
+    
+    Returns:
+        float: Posição vertical logo abaixo do parágrafo
+    """
+    while True:
+        _, altura = paragrafo.wrapOn(c, _LARGURA_UTIL, y - _Y_BASE)
+        if y - altura >= _Y_BASE:
+            break
+        
+        # Dividir o parágrafo entre as linhas que cabem na página e o restante
+        partes = paragrafo.split(_LARGURA_UTIL, y - _Y_BASE)
+        if len(partes) == 2:
+            primeira, paragrafo = partes
+            _, altura_primeira = primeira.wrapOn(c, _LARGURA_UTIL, y - _Y_BASE)
+            primeira.drawOn(c, _X_CONTEUDO, y - altura_primeira)
+        elif y >= _Y_TOPO:
+            # Não cabe nem em uma página vazia: desenhar assim mesmo
+            break
+        c.showPage()
+        y = _Y_TOPO
+    
+    paragrafo.drawOn(c, _X_CONTEUDO, y - altura)
+    return y - altura
+
+
+def nome_arquivo_termo(nome, ies):
+    """Retorna o nome do arquivo PDF do termo de um aluno"""
+    return f"{nome.replace(' ', '_')}_{ies}_termo.pdf"
+
+
+def _desenhar_termo(fileobj, ies, nome, cpf_formatado, rua, bairro, cidade, uf, curso, data_extenso):
+    """
+    Desenha o termo de um aluno a partir dos campos já extraídos da planilha
     
-    # Linha de assinatura (centralizada)
-    linha_assinatura = Paragraph("_" * 50, style_assinatura)
-    story.append(linha_assinatura)
+    Args:
+        fileobj: Objeto de arquivo aberto para escrita binária
+        ies: Código de uma IES válida
+        nome, cpf_formatado, rua, bairro, cidade, uf, curso: Dados do aluno
+        data_extenso: Data por extenso do termo
+    """
+    ies_info = IES_CONFIG[ies]
     
-    assinatura = Paragraph("Assinatura do Aluno (a)", style_assinatura)
-    story.append(assinatura)
+    # Criar página PDF (desenho direto no canvas, sem o motor de layout do Platypus)
+    c = canvas.Canvas(fileobj, pagesize=A4)
+    y = _Y_TOPO
+    
+    # Adicionar logo se existir (dados lidos uma única vez na importação)
+    logo_cache = _LOGO_CACHE.get(ies)
+    if logo_cache:
+        logo, logo_width, logo_height = logo_cache
+        
+        # Adicionar logo centralizado
+        y -= logo_height
+        c.drawImage(logo, (_PAGE_WIDTH - logo_width) / 2, y, logo_width, logo_height, mask='auto')
+    else:
+        # Se logo não existe, adiciona nome da IES
+        nome_ies = Paragraph(f"<b>{ies_info['nome_completo']}</b>", _STYLE_TITULO)
+        y = _desenhar_paragrafo(c, nome_ies, y) - _STYLE_TITULO.spaceAfter
+    y -= 0.5*cm
+    
+    # Título
+    c.setFont(_STYLE_TITULO.fontName, _STYLE_TITULO.fontSize)
+    c.drawCentredString(
+        _PAGE_WIDTH / 2, y - _STYLE_TITULO.fontSize,
+        "TERMO DE RESPONSABILIDADE DE ENTREGA DE DOCUMENTOS"
+    )
+    y -= _STYLE_TITULO.leading + _STYLE_TITULO.spaceAfter + 1*cm
+    
+    # Parágrafos fixos da IES (construídos uma única vez)
+    paragrafo2, texto3_template, paragrafo4 = _STATIC_PARAGRAPHS[ies]
+    
+    # Primeiro parágrafo (valores escapados uma vez para a marcação do Paragraph)
+    texto1 = _TEXTO1_TEMPLATE.format_map({
+        'nome': escape(str(nome)),
+        'cpf': escape(str(cpf_formatado)),
+        'rua': escape(str(rua)),
+        'bairro': escape(str(bairro)),
+        'cidade': escape(str(cidade)),
+        'uf': escape(str(uf)),
+    })
+    paragrafo1 = Paragraph(texto1, _STYLE_TEXTO)
+    
+    # Terceiro parágrafo (varia conforme IES)
+    texto3 = texto3_template.format_map({'curso': escape(str(curso))})
+    paragrafo3 = Paragraph(texto3, _STYLE_TEXTO)
+    
+    # Parágrafos justificados (o espaço antes de cada um fica contido no espaço após o anterior)
+    y -= _STYLE_TEXTO.spaceBefore
+    for paragrafo in (paragrafo1, paragrafo2, paragrafo3, paragrafo4):
+        y = _desenhar_paragrafo(c, paragrafo, y) - _STYLE_TEXTO.spaceAfter
+    y -= 2*cm
+    
+    # Data e local (alinhado à direita, quebrando a linha se a cidade for longa)
+    y -= _STYLE_DATA.spaceBefore
+    local_data = Paragraph(f"{escape(str(cidade))}, {data_extenso}.", _STYLE_DATA)
+    y = _desenhar_paragrafo(c, local_data, y) - _STYLE_DATA.spaceAfter - 1.5*cm
+    
+    # Linha de assinatura e legenda (centralizadas, mantidas juntas na mesma página)
+    y -= _STYLE_ASSINATURA.spaceBefore
+    y = _nova_pagina_se_necessario(
+        c, y, 2*_STYLE_ASSINATURA.leading + _STYLE_ASSINATURA.spaceAfter
+    )
+    c.setFont(_STYLE_ASSINATURA.fontName, _STYLE_ASSINATURA.fontSize)
+    c.drawCentredString(_PAGE_WIDTH / 2, y - _STYLE_ASSINATURA.fontSize, "_" * 50)
+    y -= _STYLE_ASSINATURA.leading + _STYLE_ASSINATURA.spaceAfter
+    
+    c.drawCentredString(_PAGE_WIDTH / 2, y - _STYLE_ASSINATURA.fontSize, "Assinatura do Aluno (a)")
     
     # Gerar PDF
-    doc.build(story)
+    c.showPage()
+    c.save()
+
+
+# Quantidade de termos concluídos entre atualizações da barra de progresso
+_UI_UPDATE_INTERVAL = 32
+
+# Quantidade de alunos enviados de uma vez a cada processo do pool
+_CHUNKSIZE = 8
+
+# Limite de processos do pool (os.cpu_count() informa as CPUs do host, mesmo em contêineres)
+_MAX_WORKERS = 4
+
+# Mínimo de termos por processo para compensar a inicialização de cada um
+# (importar o app, o pandas e o ReportLab leva cerca de 1s por processo)
+_MIN_TERMOS_POR_PROCESSO = 256
+
+
+def _gerar_termo_worker(campos, ies, data_extenso):
+    """
+    Gera um termo dentro de um processo do pool
     
-    # Obter bytes do PDF
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+    Args:
+        campos: Tupla (nome, cpf_formatado, rua, bairro, cidade, uf, curso) do aluno
+        ies: Código da IES do aluno
+        data_extenso: Data por extenso comum a todo o lote
     
-    return pdf_bytes, nome_arquivo
+    Returns:
+        tuple: (nome do arquivo, bytes do PDF, mensagem de erro ou None)
+    """
+    try:
+        # Validar IES
+        if ies not in IES_CONFIG:
+            raise ValueError(f"IES '{ies}' inválida")
+        
+        # Validar nome (linhas em branco na planilha não geram termo)
+        if pd.isna(campos[0]):
+            raise ValueError("Nome do aluno não informado")
+        
+        buffer = io.BytesIO()
+        _desenhar_termo(buffer, ies, *campos, data_extenso)
+        return nome_arquivo_termo(campos[0], ies), buffer.getvalue(), None
+    except Exception as e:
+        return None, None, str(e)
 
 
-def criar_zip_termos(df, ies_padrao=None):
+def criar_zip_termos(df, ies_padrao=None, data_extenso=None):
     """
     Cria um arquivo ZIP com todos os termos gerados
     
     Args:
         df: DataFrame com os dados dos alunos
         ies_padrao: IES padrão caso não exista coluna IES
+        data_extenso: Data por extenso dos termos (padrão: data atual)
     
     Returns:
-        bytes do arquivo ZIP
+        tuple: (bytes do arquivo ZIP, quantidade de termos gerados, lista de erros)
     """
+    # Validar colunas necessárias antes de gerar qualquer termo
+    colunas_faltando = [col for col in _COLUNAS_NECESSARIAS if col not in df.columns]
+    if colunas_faltando:
+        raise ValueError(f"Colunas faltando na planilha: {', '.join(colunas_faltando)}")
+    
     # Criar buffer para o ZIP
     zip_buffer = io.BytesIO()
     
-    # Criar arquivo ZIP
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+    # Criar arquivo ZIP (sem compressão: os PDFs já têm seus streams comprimidos)
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
         total = len(df)
         sucesso = 0
         erros = []
@@ -287,46 +506,109 @@ def criar_zip_termos(df, ies_padrao=None):
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        for index, row in df.iterrows():
-            try:
-                aluno_data = row.to_dict()
-                
-                # Definir IES para este aluno
-                if 'IES' in df.columns:
-                    ies = str(row['IES']).strip().upper()
+        # Converter nomes para texto (nomes em branco continuam ausentes)
+        nomes = df['NOME'].where(df['NOME'].isna(), df['NOME'].astype(str)).tolist()
+        
+        # Campos usados no termo, coluna a coluna (sem montar um dicionário por aluno);
+        # só eles são enviados aos processos do pool, com os CPFs já formatados
+        campos = zip(
+            nomes, [formatar_cpf(cpf) for cpf in df['CPF'].tolist()], df['RUA'].tolist(),
+            df['BAIRRO'].tolist(), df['CIDADE'].tolist(), df['UF'].tolist(), df['CURSO'].tolist()
+        )
+        
+        # Definir IES de cada aluno
+        if 'IES' in df.columns:
+            ies_lista = [str(ies).strip().upper() for ies in df['IES'].tolist()]
+        else:
+            ies_lista = [ies_padrao] * total
+        
+        # Mesma data para todos os termos do lote
+        if data_extenso is None:
+            data_extenso = formatar_data_extenso()
+        
+        # Data/hora das entradas do ZIP calculada uma única vez para todo o lote
+        data_hora_zip = datetime.now().timetuple()[:6]
+        
+        # Gerar PDFs em paralelo em lotes grandes com mais de um núcleo (cada aluno é
+        # independente); os resultados chegam na ordem da planilha e vão direto para o ZIP,
+        # no processo principal
+        num_workers = min(os.cpu_count() or 1, _MAX_WORKERS, total // _MIN_TERMOS_POR_PROCESSO)
+        if num_workers > 1:
+            pool = ProcessPoolExecutor(max_workers=num_workers, mp_context=_MP_CONTEXT)
+        else:
+            pool = nullcontext()
+        with pool as executor:
+            if executor is None:
+                # Em lotes pequenos ou com um único núcleo o pool só acrescenta custo
+                # de inicialização e de comunicação
+                resultados = map(_gerar_termo_worker, campos, ies_lista, repeat(data_extenso, total))
+            else:
+                resultados = executor.map(
+                    _gerar_termo_worker, campos, ies_lista, repeat(data_extenso, total),
+                    chunksize=_CHUNKSIZE
+                )
+            
+            for index, (nome_arquivo, pdf_bytes, erro) in enumerate(resultados):
+                if erro is None:
+                    zip_info = zipfile.ZipInfo(nome_arquivo, date_time=data_hora_zip)
+                    zip_info.compress_type = zipfile.ZIP_STORED
+                    zip_file.writestr(zip_info, pdf_bytes)
+                    sucesso += 1
                 else:
-                    ies = ies_padrao
-                
-                # Validar IES
-                if ies not in IES_CONFIG:
-                    raise ValueError(f"IES '{ies}' inválida")
+                    erro_msg = f"Erro na linha {index+1} ({nomes[index]}): {erro}"
+                    erros.append(erro_msg)
                 
-                # Gerar PDF
-                pdf_bytes, nome_arquivo = gerar_termo_pdf_bytes(aluno_data, ies)
-                
-                # Adicionar ao ZIP
-                zip_file.writestr(nome_arquivo, pdf_bytes)
-                
-                sucesso += 1
-                status_text.text(f"✓ {nome_arquivo}")
-                
-            except Exception as e:
-                erro_msg = f"Erro na linha {index+1} ({row.get('NOME', 'Nome não encontrado')}): {str(e)}"
-                erros.append(erro_msg)
-                status_text.text(f"✗ {erro_msg}")
-            
-            # Atualizar progress bar
-            progress_bar.progress((index + 1) / total)
+                # Atualizar progress bar (em blocos, para não sobrecarregar a interface)
+                concluidos = index + 1
+                if concluidos % _UI_UPDATE_INTERVAL == 0 or concluidos == total:
+                    progress_bar.progress(concluidos / total)
+                    status_text.text(f"⏳ {concluidos}/{total} aluno(s) processado(s) | {sucesso} termo(s) gerado(s)")
         
         progress_bar.empty()
         status_text.empty()
     
-    # ✅ CORREÇÃO: Resetar ponteiro do buffer para o início
-    zip_buffer.seek(0)
-    
     return zip_buffer.getvalue(), sucesso, erros
 
 
+# Tempo de vida dos caches (em segundos): as planilhas contêm dados pessoais dos alunos
+_CACHE_TTL = 600
+
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=_CACHE_TTL)
+def _load_df(file_bytes, filename):
+    """
+    Lê a planilha enviada e padroniza seus dados
+    
+    Args:
+        file_bytes: Conteúdo bruto do arquivo enviado
+        filename: Nome do arquivo enviado (define o formato)
+    
+    Returns:
+        DataFrame com colunas padronizadas e IES mapeadas
+    """
+    # Ler arquivo
+    if filename.endswith('.csv'):
+        df = pd.read_csv(io.BytesIO(file_bytes))
+    else:
+        df = pd.read_excel(io.BytesIO(file_bytes))
+    
+    # ✅ PADRONIZAR COLUNAS (SOLUÇÃO DO KEYERROR)
+    df.columns = df.columns.str.strip().str.upper()
+    
+    # ✅ MAPEAR CÓDIGOS NUMÉRICOS PARA IES
+    if 'IES' in df.columns:
+        ies_str = df['IES'].astype(str).str.strip()
+        df['IES'] = ies_str.map(_CODIGOS_IES).fillna(ies_str.str.upper())
+    
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=2, ttl=_CACHE_TTL)
+def _criar_zip_termos_cache(df, ies_padrao, data_extenso):
+    """Versão em cache de criar_zip_termos (evita gerar o mesmo ZIP novamente)"""
+    return criar_zip_termos(df, ies_padrao, data_extenso)
+
+
 def main():
     """Aplicação Streamlit"""
     
@@ -352,8 +634,8 @@ def main():
     
     with col1:
         # Container para centralizar
-        if os.path.exists("logos/logo uni.png"):
-            st.image("logos/logo uni.png", use_column_width=True)
+        if _LOGO_PATHS_OK['UNIANDRADE']:
+            st.image(IES_CONFIG['UNIANDRADE']['logo'], use_column_width=True)
         else:
             st.markdown("<h3 style='text-align: center;'>UNIANDRADE</h3>", unsafe_allow_html=True)
         
@@ -373,8 +655,8 @@ def main():
     
     with col2:
         # Container para centralizar
-        if os.path.exists("logos/logo unib.png"):
-            st.image("logos/logo unib.png", use_column_width=True)
+        if _LOGO_PATHS_OK['UNIB']:
+            st.image(IES_CONFIG['UNIB']['logo'], use_column_width=True)
         else:
             st.markdown("<h3 style='text-align: center;'>UNIB</h3>", unsafe_allow_html=True)
         
@@ -394,8 +676,8 @@ def main():
     
     with col3:
         # Container para centralizar
-        if os.path.exists("logos/logo smg.png"):
-            st.image("logos/logo smg.png", use_column_width=True)
+        if _LOGO_PATHS_OK['UNISMG']:
+            st.image(IES_CONFIG['UNISMG']['logo'], use_column_width=True)
         else:
             st.markdown("<h3 style='text-align: center;'>UNISMG</h3>", unsafe_allow_html=True)
         
@@ -434,37 +716,12 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Ler arquivo
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-            
-            # ✅ PADRONIZAR COLUNAS (SOLUÇÃO DO KEYERROR)
-            df.columns = df.columns.str.strip().str.upper()
-            
-            # ✅ MAPEAR CÓDIGOS NUMÉRICOS PARA IES
-            if 'IES' in df.columns:
-                def mapear_ies(valor):
-                    """Mapeia códigos numéricos para nomes de IES"""
-                    valor_str = str(valor).strip()
-                    
-                    # Mapeamento de códigos
-                    if valor_str == '1':
-                        return 'UNIANDRADE'
-                    elif valor_str == '201':
-                        return 'UNISMG'
-                    elif valor_str == '301':
-                        return 'UNIB'
-                    else:
-                        # Se já for texto, converter para maiúsculo
-                        return valor_str.upper()
-                
-                df['IES'] = df['IES'].apply(mapear_ies)
+            # Ler arquivo (resultado em cache entre as reexecuções do Streamlit)
+            file_bytes = uploaded_file.getvalue()
+            df = _load_df(file_bytes, uploaded_file.name)
             
             # Validar colunas necessárias
-            colunas_necessarias = ['NOME', 'CPF', 'RUA', 'BAIRRO', 'CIDADE', 'UF', 'CURSO']
-            colunas_faltando = [col for col in colunas_necessarias if col not in df.columns]
+            colunas_faltando = [col for col in _COLUNAS_NECESSARIAS if col not in df.columns]
             
             if colunas_faltando:
                 st.error(f"❌ Colunas faltando na planilha: **{', '.join(colunas_faltando)}**")
@@ -501,54 +758,72 @@ def main():
             # Botão para gerar termos
             st.subheader("3️⃣ Gerar Termos em PDF")
             
+            # Guardar o resultado na sessão: o clique no botão de download reexecuta o script
+            # e o ZIP é servido da sessão, sem gerar os termos novamente
+            chave_termos = (hashlib.sha256(file_bytes).hexdigest(), ies_padrao)
             if st.button("🚀 Gerar PDFs e Baixar ZIP", type="primary", use_container_width=True):
+                st.session_state.pop('termos_gerados', None)
                 with st.spinner("⏳ Gerando termos... Por favor, aguarde."):
                     try:
                         # Criar ZIP com todos os termos
-                        zip_bytes, sucesso, erros = criar_zip_termos(df, ies_padrao)
-                        
-                        # Resumo
-                        st.markdown("---")
-                        st.subheader("📊 Resumo da Geração")
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total de Alunos", len(df))
-                        with col2:
-                            st.metric("✅ Sucesso", sucesso)
-                        with col3:
-                            st.metric("❌ Erros", len(erros))
-                        
-                        # Mostrar erros, se houver
-                        if erros:
-                            with st.expander("⚠️ Ver detalhes dos erros"):
-                                for erro in erros:
-                                    st.error(erro)
-                        
-                        # Botão de download do ZIP
-                        if sucesso > 0:
-                            st.markdown("---")
-                            st.success("🎉 **Termos gerados com sucesso!**")
-                            
-                            # Nome do arquivo ZIP
-                            data_hoje = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            nome_zip = f"termos_{data_hoje}.zip"
-                            
-                            st.download_button(
-                                label="📥 Baixar ZIP com todos os PDFs",
-                                data=zip_bytes,
-                                file_name=nome_zip,
-                                mime="application/zip",
-                                use_container_width=True
-                            )
-                        
+                        zip_bytes, sucesso, erros = _criar_zip_termos_cache(
+                            df, ies_padrao, formatar_data_extenso()
+                        )
+                        st.session_state['termos_gerados'] = (chave_termos, zip_bytes, sucesso, erros)
                     except Exception as e:
                         st.error(f"❌ Erro ao gerar termos: {str(e)}")
+            
+            termos_gerados = st.session_state.get('termos_gerados')
+            if termos_gerados is not None and termos_gerados[0] != chave_termos:
+                # Outra planilha ou IES: descartar o ZIP anterior
+                del st.session_state['termos_gerados']
+                termos_gerados = None
+            
+            if termos_gerados is not None:
+                _, zip_bytes, sucesso, erros = termos_gerados
+                
+                # Resumo
+                st.markdown("---")
+                st.subheader("📊 Resumo da Geração")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total de Alunos", len(df))
+                with col2:
+                    st.metric("✅ Sucesso", sucesso)
+                with col3:
+                    st.metric("❌ Erros", len(erros))
+                
+                # Mostrar erros, se houver
+                if erros:
+                    with st.expander("⚠️ Ver detalhes dos erros"):
+                        for erro in erros:
+                            st.error(erro)
+                
+                # Botão de download do ZIP
+                if sucesso > 0:
+                    st.markdown("---")
+                    st.success("🎉 **Termos gerados com sucesso!**")
+                    
+                    # Nome do arquivo ZIP
+                    data_hoje = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    nome_zip = f"termos_{data_hoje}.zip"
+                    
+                    st.download_button(
+                        label="📥 Baixar ZIP com todos os PDFs",
+                        data=zip_bytes,
+                        file_name=nome_zip,
+                        mime="application/zip",
+                        use_container_width=True
+                    )
         
         except Exception as e:
             st.error(f"❌ Erro ao ler arquivo: {str(e)}")
     
     else:
+        # Sem planilha: descartar o ZIP gerado anteriormente
+        st.session_state.pop('termos_gerados', None)
+        
         # Instruções quando não há arquivo
         st.markdown("---")
         st.subheader("📝 Instruções")